@@ -1,37 +1,111 @@
-from concurrent import futures
+import asyncio
+import os
+import signal
+import tempfile
 
 import grpc
 from services.proto import sanitizer_pb2
 from services.proto import sanitizer_pb2_grpc
 
-from services.sanitizer import sanitize_file
+from services.sanitizer import (
+    MAX_BYTES,
+    pool_workers,
+    sanitize_file,
+    sanitize_file_from_path,
+    shutdown_pool,
+    start_pool,
+    sweep_cache_periodically,
+    validate_file_type,
+)
+
+# Headroom above MAX_BYTES for protobuf framing; gRPC's 4 MB default is too small.
+MAX_MESSAGE_BYTES = 32 * 1024 * 1024
+
+SERVER_OPTIONS = [
+    ("grpc.max_receive_message_length", MAX_MESSAGE_BYTES),
+    ("grpc.max_send_message_length", MAX_MESSAGE_BYTES),
+    ("grpc.default_compression_level", 2),
+]
+
+# RPCs admitted at once. Conversions are bounded by the pool; this bounds how
+# many requests (and their payloads) can queue behind them.
+MAX_CONCURRENT_RPCS = int(os.getenv("SANITIZER_MAX_CONCURRENT_RPCS", 8))
 
 class SanitizerService(sanitizer_pb2_grpc.SanitizerServiceServicer):
     """
     Implements the gRPC service definition for file sanitization.
+    Conversions run on the shared process pool, so the event loop keeps
+    admitting RPCs while documents are converted in parallel.
     """
-    def SanitizeDocument(self, request, context):
+    async def SanitizeDocument(self, request, context):
         """
         Processes a gRPC request to sanitize a document.
         """
         try:
-            sanitized = sanitize_file(request.document_data, request.document_type)
+            sanitized = await sanitize_file(request.document_data, request.document_type)
             return sanitizer_pb2.SanitizeResponse(sanitized_content=sanitized)
         except ValueError as e:
-            context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
         except Exception as e:
-            context.abort(grpc.StatusCode.INTERNAL, f"An unexpected error occurred: {e!s}")
+            await context.abort(grpc.StatusCode.INTERNAL, f"An unexpected error occurred: {e!s}")
 
-def serve():
+    async def SanitizeDocumentStream(self, request_iterator, context):
+        """
+        Processes a client-streamed document. Chunks are spooled to a temporary
+        file as they arrive so the whole document never has to sit in memory.
+        """
+        try:
+            with tempfile.NamedTemporaryFile(suffix=".pdf") as tmp:
+                document_type = None
+                received = 0
+                async for chunk in request_iterator:
+                    if document_type is None:
+                        document_type = chunk.document_type
+                        validate_file_type(document_type)
+                    received += len(chunk.chunk_data)
+                    if received > MAX_BYTES:
+                        raise ValueError(f"File too large; limit is {MAX_BYTES} bytes")
+                    await asyncio.to_thread(tmp.write, chunk.chunk_data)
+                if document_type is None:
+                    raise ValueError("No document data received")
+                await asyncio.to_thread(tmp.flush)
+                sanitized = await sanitize_file_from_path(tmp.name, document_type)
+            return sanitizer_pb2.SanitizeResponse(sanitized_content=sanitized)
+        except ValueError as e:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+        except Exception as e:
+            await context.abort(grpc.StatusCode.INTERNAL, f"An unexpected error occurred: {e!s}")
+
+async def serve_async():
     """
-    Starts the gRPC server.
+    Warms the conversion pool, then serves until SIGTERM/SIGINT.
     """
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
+    sweeper = asyncio.create_task(sweep_cache_periodically())
+    await asyncio.to_thread(start_pool)
+    server = grpc.aio.server(
+        options=SERVER_OPTIONS,
+        compression=grpc.Compression.Gzip,
+        maximum_concurrent_rpcs=MAX_CONCURRENT_RPCS,
+    )
     sanitizer_pb2_grpc.add_SanitizerServiceServicer_to_server(SanitizerService(), server)
     server.add_insecure_port('[::]:50051')
-    server.start()
-    print("gRPC server started on port 50051")
-    server.wait_for_termination()
+    await server.start()
+    print(f"gRPC server started on port 50051 with {pool_workers()} conversion workers")
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, lambda: asyncio.ensure_future(server.stop(5)))
+    try:
+        await server.wait_for_termination()
+    finally:
+        sweeper.cancel()
+        await asyncio.to_thread(shutdown_pool)
+
+def serve():
+    """
+    Starts the gRPC server.
+    """
+    asyncio.run(serve_async())
 
 if __name__ == '__main__':
     serve()
\ No newline at end of file
@@ -14,7 +14,7 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x15proto/sanitizer.proto\x12\tsanitizer\"?\n\x0fSanitizeRequest\x12\x15\n\rdocument_type\x18\x01 \x01(\t\x12\x15\n\rdocument_data\x18\x02 \x01(\x0c\"-\n\x10SanitizeResponse\x12\x19\n\x11sanitized_content\x18\x01 \x01(\t2_\n\x10SanitizerService\x12K\n\x10SanitizeDocument\x12\x1a.sanitizer.SanitizeRequest\x1a\x1b.sanitizer.SanitizeResponseb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x15proto/sanitizer.proto\x12\tsanitizer\"?\n\x0fSanitizeRequest\x12\x15\n\rdocument_type\x18\x01 \x01(\t\x12\x15\n\rdocument_data\x18\x02 \x01(\x0c\":\n\rDocumentChunk\x12\x15\n\rdocument_type\x18\x01 \x01(\t\x12\x12\n\nchunk_data\x18\x02 \x01(\x0c\"-\n\x10SanitizeResponse\x12\x19\n\x11sanitized_content\x18\x01 \x01(\t2\xb2\x01\n\x10SanitizerService\x12K\n\x10SanitizeDocument\x12\x1a.sanitizer.SanitizeRequest\x1a\x1b.sanitizer.SanitizeResponse\x12Q\n\x16SanitizeDocumentStream\x12\x18.sanitizer.DocumentChunk\x1a\x1b.sanitizer.SanitizeResponse(\x01\x62\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -23,8 +23,10 @@ if _descriptor._USE_C_DESCRIPTORS == False:
   DESCRIPTOR._options = None
   _globals['_SANITIZEREQUEST']._serialized_start=36
   _globals['_SANITIZEREQUEST']._serialized_end=99
-  _globals['_SANITIZERESPONSE']._serialized_start=101
-  _globals['_SANITIZERESPONSE']._serialized_end=146
-  _globals['_SANITIZERSERVICE']._serialized_start=148
-  _globals['_SANITIZERSERVICE']._serialized_end=243
+  _globals['_DOCUMENTCHUNK']._serialized_start=101
+  _globals['_DOCUMENTCHUNK']._serialized_end=159
+  _globals['_SANITIZERESPONSE']._serialized_start=161
+  _globals['_SANITIZERESPONSE']._serialized_end=206
+  _globals['_SANITIZERSERVICE']._serialized_start=209
+  _globals['_SANITIZERSERVICE']._serialized_end=387
 # @@protoc_insertion_point(module_scope)
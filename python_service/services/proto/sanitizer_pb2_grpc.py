@@ -20,6 +20,11 @@ class SanitizerServiceStub(object):
                 request_serializer=proto_dot_sanitizer__pb2.SanitizeRequest.SerializeToString,
                 response_deserializer=proto_dot_sanitizer__pb2.SanitizeResponse.FromString,
                 )
+        self.SanitizeDocumentStream = channel.stream_unary(
+                '/sanitizer.SanitizerService/SanitizeDocumentStream',
+                request_serializer=proto_dot_sanitizer__pb2.DocumentChunk.SerializeToString,
+                response_deserializer=proto_dot_sanitizer__pb2.SanitizeResponse.FromString,
+                )
 
 
 class SanitizerServiceServicer(object):
@@ -33,6 +38,13 @@ class SanitizerServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def SanitizeDocumentStream(self, request_iterator, context):
+        """A RPC to sanitize a document streamed in chunks, for large files.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_SanitizerServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -41,6 +53,11 @@ def add_SanitizerServiceServicer_to_server(servicer, server):
                     request_deserializer=proto_dot_sanitizer__pb2.SanitizeRequest.FromString,
                     response_serializer=proto_dot_sanitizer__pb2.SanitizeResponse.SerializeToString,
             ),
+            'SanitizeDocumentStream': grpc.stream_unary_rpc_method_handler(
+                    servicer.SanitizeDocumentStream,
+                    request_deserializer=proto_dot_sanitizer__pb2.DocumentChunk.FromString,
+                    response_serializer=proto_dot_sanitizer__pb2.SanitizeResponse.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'sanitizer.SanitizerService', rpc_method_handlers)
@@ -68,3 +85,20 @@ class SanitizerService(object):
             proto_dot_sanitizer__pb2.SanitizeResponse.FromString,
             options, channel_credentials,
             insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def SanitizeDocumentStream(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_unary(request_iterator, target, '/sanitizer.SanitizerService/SanitizeDocumentStream',
+            proto_dot_sanitizer__pb2.DocumentChunk.SerializeToString,
+            proto_dot_sanitizer__pb2.SanitizeResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
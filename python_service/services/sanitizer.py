@@ -1,28 +1,334 @@
+import asyncio
+import hashlib
+import importlib.metadata
 import io
+import multiprocessing
+import os
+import pathlib
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import fitz
+from docling.datamodel.base_models import DocumentStream, InputFormat
 from docling.document_converter import DocumentConverter
 
 MAX_BYTES = 25 * 1024 * 1024  
+PAGES_PER_RANGE = 4
+SUPPORTED_FILE_TYPES = ("application/pdf",)
+CACHE_DIR = pathlib.Path(os.getenv("SANITIZER_CACHE", "/tmp/sanitize-cache"))
+# Entries hold the plaintext of user documents, so they expire; 0 disables the cache.
+CACHE_MAX_AGE = int(os.getenv("SANITIZER_CACHE_MAX_AGE", 7 * 24 * 60 * 60))
+# Once entries exceed this many bytes, the oldest are swept first.
+CACHE_MAX_BYTES = int(os.getenv("SANITIZER_CACHE_MAX_BYTES", 1024 * 1024 * 1024))
+CACHE_SWEEP_INTERVAL = 60 * 60
+# Bump CACHE_FORMAT when the markdown output changes. The Docling version and
+# range size are part of the namespace so upgrades never serve stale output.
+CACHE_FORMAT = 1
+_CACHE_NAMESPACE = (
+    f"v{CACHE_FORMAT}-docling-{importlib.metadata.version('docling')}-pages-{PAGES_PER_RANGE}"
+)
+
+_CONVERTER: DocumentConverter | None = None
+_CONVERTER_LOCK = threading.Lock()
+# Docling does not document DocumentConverter as thread-safe, so conversions
+# on the shared instance are serialised within a process.
+_CONVERT_LOCK = threading.Lock()
+_POOL: ProcessPoolExecutor | None = None
+_POOL_LOCK = threading.Lock()
+
+def available_cpus() -> int:
+    """
+    Returns the CPUs this process may run on. Unlike os.cpu_count(), this
+    honours the affinity mask a container runtime applies.
+    """
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+def pool_workers() -> int:
+    """
+    Number of conversion processes. Each one loads its own Docling models,
+    so the default is capped rather than scaled to every available CPU.
+    """
+    workers = int(os.getenv("SANITIZER_POOL_WORKERS", min(available_cpus(), 4)))
+    if workers < 1:
+        raise ValueError(f"SANITIZER_POOL_WORKERS must be at least 1, got {workers}")
+    return workers
+
+def _get_converter() -> DocumentConverter:
+    """
+    Returns the process-wide DocumentConverter, creating it on first use.
+    Docling loads its layout/OCR models lazily, so sharing one converter
+    keeps that initialisation from being repeated on every request.
+    """
+    global _CONVERTER
+    if _CONVERTER is None:
+        with _CONVERTER_LOCK:
+            if _CONVERTER is None:
+                _CONVERTER = DocumentConverter()
+    return _CONVERTER
+
+def warm_up_converter() -> None:
+    """
+    Builds the shared converter and its PDF pipeline ahead of the first request.
+    """
+    with _CONVERT_LOCK:
+        _get_converter().initialize_pipeline(InputFormat.PDF)
+
+def _init_pool_worker() -> None:
+    """
+    Limits torch to this worker's share of the CPUs, then loads the models.
+    torch ships with Docling; it is imported here because only pool workers
+    run models.
+    """
+    import torch
+
+    torch.set_num_threads(max(1, available_cpus() // pool_workers()))
+    warm_up_converter()
 
-def sanitize_pdf(file_bytes: bytes) -> str:
-    temp_file = io.BytesIO(file_bytes)
-    converter = DocumentConverter()
-    conv_res = converter.convert(temp_file)
+def _ping(_: int) -> None:
+    pass
 
-    document = conv_res.document
+def get_pool() -> ProcessPoolExecutor:
+    """
+    Returns the process pool that runs every conversion. Workers are spawned
+    rather than forked so they don't inherit gRPC threads from the server.
+    """
+    global _POOL
+    if _POOL is None:
+        with _POOL_LOCK:
+            if _POOL is None:
+                _POOL = ProcessPoolExecutor(
+                    max_workers=pool_workers(),
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_pool_worker,
+                )
+    return _POOL
+
+def start_pool() -> None:
+    """
+    Spawns every pool worker and waits for it to load its models, so the
+    first requests don't pay for model initialisation.
+    """
+    workers = pool_workers()
+    list(get_pool().map(_ping, range(workers)))
+
+def shutdown_pool() -> None:
+    global _POOL
+    with _POOL_LOCK:
+        pool, _POOL = _POOL, None
+    if pool is not None:
+        pool.shutdown(cancel_futures=True)
+
+def _discard_pool(pool: ProcessPoolExecutor) -> None:
+    """
+    Drops a broken pool so the next get_pool() call builds a fresh one.
+    """
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is pool:
+            _POOL = None
+    pool.shutdown(wait=False, cancel_futures=True)
 
-    markdown_output = document.export_to_markdown()
-    
-    return markdown_output.strip()
+async def _run_in_pool(func, *args):
+    loop = asyncio.get_running_loop()
+    pool = get_pool()
+    try:
+        return await loop.run_in_executor(pool, func, *args)
+    except BrokenProcessPool:
+        # A worker died (e.g. OOM-killed); rebuild the pool and retry once.
+        _discard_pool(pool)
+        return await loop.run_in_executor(get_pool(), func, *args)
 
-def sanitize_file(file_data: bytes, file_type: str) -> str:
+def _convert(source: str | DocumentStream) -> str:
+    with _CONVERT_LOCK:
+        conv_res = _get_converter().convert(source)
+
+    return conv_res.document.export_to_markdown().strip()
+
+def convert_pdf_bytes(file_bytes: bytes) -> str:
+    return _convert(DocumentStream(name="document.pdf", stream=io.BytesIO(file_bytes)))
+
+def convert_pdf_path(path: str) -> str:
+    return _convert(path)
+
+def _split_pages(doc: fitz.Document) -> list[bytes]:
+    """
+    Splits an open PDF into standalone sub-PDFs of PAGES_PER_RANGE pages each.
+    """
+    parts = []
+    for start in range(0, doc.page_count, PAGES_PER_RANGE):
+        end = min(start + PAGES_PER_RANGE, doc.page_count)
+        with fitz.open() as part:
+            part.insert_pdf(doc, from_page=start, to_page=end - 1)
+            parts.append(part.tobytes())
+    return parts
+
+def split_pdf(source: bytes | str) -> list[bytes] | None:
+    """
+    Returns the document as page-range sub-PDFs that can be converted in
+    parallel, or None when it should be converted whole: when it is short,
+    or when a single pool worker would convert the ranges serially anyway
+    and splitting would only cost cross-page context.
+    """
+    if pool_workers() <= 1:
+        return None
+    if isinstance(source, bytes):
+        doc = fitz.open(stream=source, filetype="pdf")
+    else:
+        doc = fitz.open(source)
+    with doc:
+        if doc.page_count <= PAGES_PER_RANGE:
+            return None
+        return _split_pages(doc)
+
+async def convert_pdf(source: bytes | str) -> str:
+    """
+    Converts a PDF given as bytes or a file path on the conversion pool.
+    Long documents are split so their page ranges convert in parallel.
+    """
+    parts = await asyncio.to_thread(split_pdf, source)
+    if parts is None:
+        convert = convert_pdf_bytes if isinstance(source, bytes) else convert_pdf_path
+        return await _run_in_pool(convert, source)
+
+    markdowns = await asyncio.gather(*(_run_in_pool(convert_pdf_bytes, part) for part in parts))
+    return "\n\n".join(markdown for markdown in markdowns if markdown)
+
+def _cache_path(key: str) -> pathlib.Path:
+    return CACHE_DIR / _CACHE_NAMESPACE / key[:2] / key
+
+def _is_expired(path: pathlib.Path) -> bool:
+    return time.time() - path.stat().st_mtime > CACHE_MAX_AGE
+
+def _read_cache(key: str) -> str | None:
+    """
+    Returns the cached output for key, or None on a miss. Expired, unreadable
+    or corrupt entries are treated as misses.
+    """
+    if CACHE_MAX_AGE <= 0:
+        return None
+    path = _cache_path(key)
+    try:
+        if _is_expired(path):
+            path.unlink(missing_ok=True)
+            return None
+        return path.read_text(encoding="utf-8")
+    except (OSError, UnicodeDecodeError):
+        return None
+
+def _write_cache(key: str, content: str) -> None:
+    """
+    Stores sanitized output under its content hash. The file is written next to
+    its final location and renamed into place, so concurrent readers never see
+    a partial entry. Caching is best effort; write failures are ignored.
+    """
+    if CACHE_MAX_AGE <= 0:
+        return
+    path = _cache_path(key)
+    tmp_path = None
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent)
+        with os.fdopen(fd, "w", encoding="utf-8") as tmp:
+            tmp.write(content)
+        os.replace(tmp_path, path)
+    except OSError:
+        if tmp_path is not None:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+
+def sweep_cache() -> None:
+    """
+    Deletes expired cache entries, including those left behind by older cache
+    namespaces and interrupted writes, then deletes the oldest remaining
+    entries until the cache fits in CACHE_MAX_BYTES. The server runs this at
+    startup and every CACHE_SWEEP_INTERVAL seconds.
+    """
+    if not CACHE_DIR.is_dir():
+        return
+    now = time.time()
+    entries = []
+    for path in CACHE_DIR.rglob("*"):
+        try:
+            if not path.is_file():
+                continue
+            stat = path.stat()
+            if CACHE_MAX_AGE <= 0 or now - stat.st_mtime > CACHE_MAX_AGE:
+                path.unlink()
+            else:
+                entries.append((stat.st_mtime, stat.st_size, path))
+        except OSError:
+            pass
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+        if total <= CACHE_MAX_BYTES:
+            break
+        try:
+            path.unlink()
+        except OSError:
+            pass
+        total -= size
+
+async def sweep_cache_periodically() -> None:
+    """
+    Sweeps the cache every CACHE_SWEEP_INTERVAL seconds until cancelled.
+    """
+    while True:
+        await asyncio.to_thread(sweep_cache)
+        await asyncio.sleep(CACHE_SWEEP_INTERVAL)
+
+def validate_file_type(file_type: str) -> None:
+    if file_type not in SUPPORTED_FILE_TYPES:
+        raise ValueError(f"Unsupported file type: {file_type}")
+
+def _hash_file(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+async def _convert_cached(key: str, source: bytes | str) -> str:
+    """
+    Returns the cached output for key, converting source on a miss. Cache I/O
+    runs in a thread so hits are served without waiting for the pool.
+    """
+    cached = await asyncio.to_thread(_read_cache, key)
+    if cached is not None:
+        return cached
+
+    sanitized = await convert_pdf(source)
+    await asyncio.to_thread(_write_cache, key, sanitized)
+    return sanitized
+
+async def sanitize_file(file_data: bytes, file_type: str) -> str:
     """
     Sanitizes a file by converting its content to a clean markdown string.
-    This function now directly accepts file data as bytes.
+    This function now directly accepts file data as bytes. Results are cached
+    by the SHA-256 of the file, so re-uploads skip the Docling conversion.
     """
     if len(file_data) > MAX_BYTES:
         raise ValueError(f"File too large; limit is {MAX_BYTES} bytes")
 
-    if file_type == "application/pdf":
-        return sanitize_pdf(file_data)
-    else:
-        raise ValueError(f"Unsupported file type: {file_type}")
\ No newline at end of file
+    validate_file_type(file_type)
+
+    key = await asyncio.to_thread(lambda: hashlib.sha256(file_data).hexdigest())
+    return await _convert_cached(key, file_data)
+
+async def sanitize_file_from_path(path: str, file_type: str) -> str:
+    """
+    Sanitizes a file already on disk, e.g. one assembled from a streamed upload,
+    without first loading it into memory. Shares the cache used by sanitize_file.
+    """
+    if os.path.getsize(path) > MAX_BYTES:
+        raise ValueError(f"File too large; limit is {MAX_BYTES} bytes")
+
+    validate_file_type(file_type)
+
+    key = await asyncio.to_thread(_hash_file, path)
+    return await _convert_cached(key, path)
\ No newline at end of file
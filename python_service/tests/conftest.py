@@ -0,0 +1,47 @@
+"""
+Shared setup for the sanitizer service tests. Docling, PyMuPDF and torch are
+replaced with empty stub modules so the tests run without loading any models;
+tests that need their behaviour patch in fakes.
+"""
+import importlib.metadata
+import pathlib
+import sys
+import types
+
+import pytest
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+def _stub_module(name: str, **attrs) -> types.ModuleType:
+    module = types.ModuleType(name)
+    module.__dict__.update(attrs)
+    sys.modules[name] = module
+    return module
+
+class _DocumentStream:
+    def __init__(self, name, stream):
+        self.name = name
+        self.stream = stream
+
+_stub_module("docling")
+_stub_module("docling.datamodel")
+_stub_module(
+    "docling.datamodel.base_models",
+    DocumentStream=_DocumentStream,
+    InputFormat=types.SimpleNamespace(PDF="pdf"),
+)
+_stub_module("docling.document_converter", DocumentConverter=object)
+_stub_module("fitz", Document=object)
+_stub_module("torch", set_num_threads=lambda n: None)
+
+_real_version = importlib.metadata.version
+importlib.metadata.version = lambda name: "0.0.0" if name == "docling" else _real_version(name)
+try:
+    from services import sanitizer  # noqa: E402
+finally:
+    importlib.metadata.version = _real_version
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(sanitizer, "CACHE_DIR", tmp_path)
+    return tmp_path
@@ -0,0 +1,83 @@
+import asyncio
+
+import pytest
+
+grpc = pytest.importorskip("grpc")
+
+import main_grpc_server  # noqa: E402
+from services.proto import sanitizer_pb2  # noqa: E402
+
+PDF = "application/pdf"
+
+class Aborted(Exception):
+    pass
+
+class FakeContext:
+    def __init__(self):
+        self.code = None
+        self.details = None
+
+    async def abort(self, code, details):
+        self.code = code
+        self.details = details
+        raise Aborted()
+
+async def _chunks(*chunks):
+    for chunk in chunks:
+        yield chunk
+
+def _stream(*chunks):
+    context = FakeContext()
+    service = main_grpc_server.SanitizerService()
+    try:
+        response = asyncio.run(service.SanitizeDocumentStream(_chunks(*chunks), context))
+    except Aborted:
+        response = None
+    return response, context
+
+@pytest.fixture
+def converted(monkeypatch):
+    paths = []
+
+    async def fake_sanitize_file_from_path(path, file_type):
+        with open(path, "rb") as f:
+            paths.append(path)
+            return f.read().decode()
+
+    monkeypatch.setattr(main_grpc_server, "sanitize_file_from_path", fake_sanitize_file_from_path)
+    return paths
+
+def test_stream_spools_chunks_and_converts(converted):
+    response, context = _stream(
+        sanitizer_pb2.DocumentChunk(document_type=PDF, chunk_data=b"ab"),
+        sanitizer_pb2.DocumentChunk(chunk_data=b"cd"),
+    )
+
+    assert context.code is None
+    assert response.sanitized_content == "abcd"
+    assert len(converted) == 1
+
+def test_empty_stream_is_rejected(converted):
+    _, context = _stream()
+
+    assert context.code == grpc.StatusCode.INVALID_ARGUMENT
+    assert context.details == "No document data received"
+    assert converted == []
+
+def test_unsupported_type_is_rejected_on_first_chunk(converted):
+    _, context = _stream(sanitizer_pb2.DocumentChunk(document_type="text/plain", chunk_data=b"ab"))
+
+    assert context.code == grpc.StatusCode.INVALID_ARGUMENT
+    assert context.details == "Unsupported file type: text/plain"
+    assert converted == []
+
+def test_oversize_stream_is_rejected(converted, monkeypatch):
+    monkeypatch.setattr(main_grpc_server, "MAX_BYTES", 3)
+    _, context = _stream(
+        sanitizer_pb2.DocumentChunk(document_type=PDF, chunk_data=b"ab"),
+        sanitizer_pb2.DocumentChunk(chunk_data=b"cd"),
+    )
+
+    assert context.code == grpc.StatusCode.INVALID_ARGUMENT
+    assert context.details == "File too large; limit is 3 bytes"
+    assert converted == []
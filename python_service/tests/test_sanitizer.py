@@ -0,0 +1,178 @@
+import asyncio
+import hashlib
+import os
+import time
+from concurrent.futures import Executor, Future
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from services import sanitizer
+
+PDF = "application/pdf"
+
+def _key(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+@pytest.fixture
+def conversions(monkeypatch):
+    calls = []
+
+    async def fake_convert_pdf(source):
+        calls.append(source)
+        return "# converted"
+
+    monkeypatch.setattr(sanitizer, "convert_pdf", fake_convert_pdf)
+    return calls
+
+def test_cache_miss_converts_and_hit_skips_conversion(cache_dir, conversions):
+    first = asyncio.run(sanitizer.sanitize_file(b"%PDF-doc", PDF))
+    second = asyncio.run(sanitizer.sanitize_file(b"%PDF-doc", PDF))
+
+    assert first == second == "# converted"
+    assert conversions == [b"%PDF-doc"]
+    assert sanitizer._cache_path(_key(b"%PDF-doc")).is_file()
+
+def test_path_and_bytes_share_cache_entries(cache_dir, conversions, tmp_path):
+    path = tmp_path / "upload.pdf"
+    path.write_bytes(b"%PDF-doc")
+
+    asyncio.run(sanitizer.sanitize_file(b"%PDF-doc", PDF))
+    assert asyncio.run(sanitizer.sanitize_file_from_path(str(path), PDF)) == "# converted"
+    assert len(conversions) == 1
+
+def test_expired_entry_is_a_miss_and_removed(cache_dir):
+    key = _key(b"old")
+    sanitizer._write_cache(key, "stale")
+    path = sanitizer._cache_path(key)
+    expired = time.time() - sanitizer.CACHE_MAX_AGE - 1
+    os.utime(path, (expired, expired))
+
+    assert sanitizer._read_cache(key) is None
+    assert not path.exists()
+
+def test_corrupt_entry_is_a_miss(cache_dir):
+    key = _key(b"corrupt")
+    path = sanitizer._cache_path(key)
+    path.parent.mkdir(parents=True)
+    path.write_bytes(b"\xff\xfe\xfa")
+
+    assert sanitizer._read_cache(key) is None
+
+def test_cache_disabled_when_max_age_is_zero(cache_dir, monkeypatch):
+    monkeypatch.setattr(sanitizer, "CACHE_MAX_AGE", 0)
+    key = _key(b"doc")
+    sanitizer._write_cache(key, "content")
+
+    assert sanitizer._read_cache(key) is None
+    assert not list(cache_dir.rglob("*"))
+
+def test_failed_write_leaves_no_temp_file(cache_dir, monkeypatch):
+    def fail_replace(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(sanitizer.os, "replace", fail_replace)
+    key = _key(b"doc")
+    sanitizer._write_cache(key, "content")
+
+    assert list(sanitizer._cache_path(key).parent.iterdir()) == []
+
+def test_sweep_removes_expired_then_oldest_beyond_size_bound(cache_dir, monkeypatch):
+    monkeypatch.setattr(sanitizer, "CACHE_MAX_BYTES", 25)
+    now = time.time()
+    paths = []
+    for age, name in [(sanitizer.CACHE_MAX_AGE + 1, b"expired"), (30, b"a"), (20, b"b"), (10, b"c")]:
+        key = _key(name)
+        sanitizer._write_cache(key, "x" * 10)
+        path = sanitizer._cache_path(key)
+        os.utime(path, (now - age, now - age))
+        paths.append(path)
+
+    sanitizer.sweep_cache()
+
+    assert [path.exists() for path in paths] == [False, False, True, True]
+
+class FakePdf:
+    def __init__(self, page_count=0):
+        self.page_count = page_count
+        self.ranges = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def insert_pdf(self, doc, from_page, to_page):
+        self.ranges.append((from_page, to_page))
+
+    def tobytes(self):
+        return repr(self.ranges).encode()
+
+@pytest.fixture
+def fake_fitz(monkeypatch):
+    def fake_open(filename=None, stream=None, filetype=None):
+        return FakePdf()
+
+    monkeypatch.setattr(sanitizer.fitz, "open", fake_open, raising=False)
+
+@pytest.mark.parametrize(
+    ("page_count", "ranges"),
+    [
+        (1, [(0, 0)]),
+        (4, [(0, 3)]),
+        (5, [(0, 3), (4, 4)]),
+        (8, [(0, 3), (4, 7)]),
+        (10, [(0, 3), (4, 7), (8, 9)]),
+    ],
+)
+def test_split_pages_covers_every_page_once(fake_fitz, page_count, ranges):
+    parts = sanitizer._split_pages(FakePdf(page_count))
+
+    assert parts == [repr([page_range]).encode() for page_range in ranges]
+
+@pytest.mark.parametrize(("page_count", "workers"), [(4, 4), (10, 1)])
+def test_split_pdf_converts_whole_when_short_or_single_worker(monkeypatch, page_count, workers):
+    monkeypatch.setenv("SANITIZER_POOL_WORKERS", str(workers))
+    monkeypatch.setattr(sanitizer.fitz, "open", lambda *a, **kw: FakePdf(page_count), raising=False)
+
+    assert sanitizer.split_pdf(b"%PDF") is None
+
+def test_pool_workers_rejects_zero(monkeypatch):
+    monkeypatch.setenv("SANITIZER_POOL_WORKERS", "0")
+
+    with pytest.raises(ValueError):
+        sanitizer.pool_workers()
+
+class FakePool(Executor):
+    def __init__(self, broken):
+        self.broken = broken
+        self.shut_down = False
+
+    def submit(self, func, *args):
+        future = Future()
+        if self.broken:
+            future.set_exception(BrokenProcessPool("worker died"))
+        else:
+            future.set_result(func(*args))
+        return future
+
+    def shutdown(self, wait=True, *, cancel_futures=False):
+        self.shut_down = True
+
+def test_run_in_pool_rebuilds_a_broken_pool_and_retries(monkeypatch):
+    broken, fresh = FakePool(broken=True), FakePool(broken=False)
+    pools = iter([broken, fresh])
+    monkeypatch.setattr(sanitizer, "get_pool", lambda: next(pools))
+    monkeypatch.setattr(sanitizer, "_POOL", broken)
+
+    assert asyncio.run(sanitizer._run_in_pool(str.upper, "md")) == "MD"
+    assert broken.shut_down
+    assert sanitizer._POOL is None
+
+def test_run_in_pool_retries_only_once(monkeypatch):
+    pools = iter([FakePool(broken=True), FakePool(broken=True)])
+    monkeypatch.setattr(sanitizer, "get_pool", lambda: next(pools))
+
+    with pytest.raises(BrokenProcessPool):
+        asyncio.run(sanitizer._run_in_pool(str.upper, "md"))
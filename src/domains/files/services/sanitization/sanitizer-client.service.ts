@@ -16,6 +16,8 @@ const REQUEST_TIMEOUT_MS = (() => {
   const n = Number(raw);
   return Number.isFinite(n) && n > 0 ? n : 10000;
 })();
+// Matches the Python server limit; the 4 MB gRPC default is too small for large documents
+const MAX_MESSAGE_BYTES = 32 * 1024 * 1024;
 
 // TLS Configuration
 const {
@@ -84,6 +86,7 @@ async function getSanitizerClient(): Promise<SanitizerServiceClientType> {
     sanitizerClient = new sanitizer.SanitizerServiceClient(
       GRPC_HOST,
       credentials,
+      { 'grpc.max_receive_message_length': MAX_MESSAGE_BYTES },
     );
   }
   return sanitizerClient;